@@ -1,10 +1,7 @@
 import argparse
 import arcade
-import random
 from enum import Enum, auto
 
-# random.seed(42)
-
 from lib.grid import GridGraph, CellState
 from lib.persistence import save_grid_to_json, load_grid_from_json
 
@@ -22,20 +19,20 @@ SCREEN_HEIGHT = (CELL_SIZE + MARGIN) * GRID_ROWS + MARGIN
 SCREEN_TITLE = "grid search algorithms."
 
 # --- Color Constants ---
-CELL_STATE_TO_COLOR = {
-    CellState.ACTIVE: arcade.color.GREEN,
-    CellState.INACTIVE: arcade.color.RED,
-    CellState.CURRENT: arcade.color.BLUE,
-    CellState.VISITED: arcade.color.DARK_BLUE,
-    CellState.GOAL: arcade.color.YELLOW,
-    CellState.SLOW: arcade.color.PURPLE,
-}
-
 BACKGROUND_COLOR = arcade.color.BLACK
 UNKNOWN_COLOR = arcade.color.WHITE
 
-# 4-way movement
-DIRECTIONS = [(0, 1), (1, 0), (0, -1), (-1, 0)]
+# indexed by the CellState value, auto() values start at 1
+COLOR_BY_STATE = (
+    UNKNOWN_COLOR,
+    arcade.color.GREEN,  # ACTIVE
+    arcade.color.RED,  # INACTIVE
+    arcade.color.PURPLE,  # SLOW
+    arcade.color.BLUE,  # CURRENT
+    arcade.color.DARK_BLUE,  # VISITED
+    arcade.color.YELLOW,  # GOAL
+)
+assert len(COLOR_BY_STATE) == max(CellState) + 1, "missing CellState colors"
 
 AUTOSTEP_EVERY: float = 0.25
 
@@ -79,8 +76,60 @@ class MyGame(arcade.Window):
         self.should_step = False
         self.time_since_step = 0.0
 
+        # center of each column / row in pixels
+        self.cx = tuple(
+            (MARGIN + CELL_SIZE) * col + MARGIN + CELL_SIZE // 2
+            for col in range(GRID_COLS)
+        )
+        self.cy = tuple(
+            (MARGIN + CELL_SIZE) * row + MARGIN + CELL_SIZE // 2
+            for row in range(GRID_ROWS)
+        )
+
+        self.build_shapes()
         self.compute_path()
 
+    def build_shapes(self) -> None:
+        """Build one outline shape per cell, drawn as a single batch.
+
+        Cells that change state are added to self.dirty,
+        their shape is swapped in on_draw.
+        """
+        self.shapes = arcade.shape_list.ShapeElementList()
+        self.shape_grid = [[None] * GRID_COLS for _ in range(GRID_ROWS)]
+        # state each shape was drawn with, one byte per cell
+        self.drawn_states = bytearray(GRID_ROWS * GRID_COLS)
+        for row in range(GRID_ROWS):
+            for col in range(GRID_COLS):
+                state = self.grid.at(row, col).state
+                shape = self.make_cell_shape(row, col, state)
+                self.shape_grid[row][col] = shape
+                self.drawn_states[row * GRID_COLS + col] = state
+                self.shapes.append(shape)
+        # flush the new shapes into the batch, so they can be removed later on
+        self.shapes.update()
+        self.dirty: set[tuple[int, int]] = set()
+
+    def make_cell_shape(
+        self, row: int, col: int, state: CellState
+    ) -> arcade.shape_list.Shape:
+        return arcade.shape_list.create_rectangle_outline(
+            self.cx[col], self.cy[row], CELL_SIZE, CELL_SIZE, COLOR_BY_STATE[state]
+        )
+
+    def refresh_dirty_cells(self) -> None:
+        for row, col in self.dirty:
+            state = self.grid.at(row, col).state
+            if self.drawn_states[row * GRID_COLS + col] == state:
+                # changed back to the state it was drawn with, keep the shape
+                continue
+            self.shapes.remove(self.shape_grid[row][col])
+            shape = self.make_cell_shape(row, col, state)
+            self.shape_grid[row][col] = shape
+            self.drawn_states[row * GRID_COLS + col] = state
+            self.shapes.append(shape)
+        self.dirty.clear()
+
     def compute_path(self) -> None:
         match self.algorithm:
             case "bfs":
@@ -91,6 +140,12 @@ class MyGame(arcade.Window):
                 self.path_to_goal = self.grid.find_path_greedy_bfs()
             case "greedy_random_bfs":
                 self.path_to_goal = self.grid.find_path_greedy_semirandom_bfs()
+            case "astar":
+                self.path_to_goal = self.grid.find_path_astar()
+            case "bidir_astar":
+                self.path_to_goal = self.grid.find_path_bidir_astar()
+            case "jps":
+                self.path_to_goal = self.grid.find_path_jps()
             case _:
                 raise ValueError(f"algorithm {self.algorithm} not supported")
 
@@ -111,21 +166,12 @@ class MyGame(arcade.Window):
         # This command has to happen before we start drawing
         self.clear()
 
-        # Loop through each grid location
-        for row in range(GRID_ROWS):
-            for col in range(GRID_COLS):
-                # Determine the color based on the state (1 or 0)
-                cell = self.grid.at(row, col)
-                color = CELL_STATE_TO_COLOR.get(cell.state, UNKNOWN_COLOR)
-
-                # Calculate the center x, y coordinates for the rectangle
-                x = (MARGIN + CELL_SIZE) * col + MARGIN + CELL_SIZE // 2
-                y = (MARGIN + CELL_SIZE) * row + MARGIN + CELL_SIZE // 2
-
-                arcade.draw_rect_outline(
-                    arcade.rect.XYWH(x, y, CELL_SIZE, CELL_SIZE),
-                    color,
-                )
+        # swap the shapes of the cells that changed since the last frame.
+        # done here and not in on_update,
+        # a shape has to be drawn once before it can be removed
+        if self.dirty:
+            self.refresh_dirty_cells()
+        self.shapes.draw()
 
     def on_update(self, delta_time: float) -> None:
         """
@@ -133,20 +179,28 @@ class MyGame(arcade.Window):
         Normally, you'll call update() on the sprite lists that
         need it.
         """
-        if self.game_mode == GameMode.SEARCH:
-            self.time_since_step += delta_time
-
-            if self.autoplay and self.time_since_step > AUTOSTEP_EVERY:
-                self.should_step = True
+        # nothing to advance: editing, no path, or already at the goal
+        if (
+            self.game_mode != GameMode.SEARCH
+            or self.path_to_goal is None
+            or self.step >= self.steps_to_goal
+        ):
+            return
+
+        self.time_since_step += delta_time
+
+        if self.autoplay and self.time_since_step > AUTOSTEP_EVERY:
+            self.should_step = True
+
+        if self.should_step:
+            if self.grid.current is not None:
+                self.dirty.add(self.grid.current)
+            self.grid.set_current(*self.path_to_goal[self.step])
+            self.dirty.add(self.grid.current)
+            self.step += 1
+            self.time_since_step = 0.0
 
-            if self.should_step:
-                if self.path_to_goal is None or self.step >= self.steps_to_goal:
-                    return
-                self.grid.set_current(*self.path_to_goal[self.step])
-                self.step += 1
-                self.time_since_step = 0.0
-
-            self.should_step = False
+        self.should_step = False
 
     def on_key_press(self, key, key_modifiers) -> None:
         """
@@ -185,14 +239,24 @@ class MyGame(arcade.Window):
                 self.should_step = True
 
             case GameMode.EDIT:
-                grid_tile_i, grid_tile_j = self.mouse_position_to_tile(x, y)
+                tile = self.mouse_position_to_tile(x, y)
+                if tile is None:
+                    # clicked outside the grid
+                    return
+                grid_tile_i, grid_tile_j = tile
                 self.grid.at(grid_tile_i, grid_tile_j).flip_active()
+                self.dirty.add((grid_tile_i, grid_tile_j))
                 self.cells_changed = True
 
-    def mouse_position_to_tile(self, x, y) -> tuple[int, int]:
-        col = (x - MARGIN) // (CELL_SIZE + MARGIN)
-        row = (y - MARGIN) // (CELL_SIZE + MARGIN)
-        return int(row), int(col)
+    def mouse_position_to_tile(self, x, y) -> tuple[int, int] | None:
+        """Return the (row, col) of the tile under x, y.
+
+        None if it is outside the grid."""
+        col = int((x - MARGIN) // (CELL_SIZE + MARGIN))
+        row = int((y - MARGIN) // (CELL_SIZE + MARGIN))
+        if not (0 <= row < GRID_ROWS and 0 <= col < GRID_COLS):
+            return None
+        return row, col
 
 
 def parse_args() -> argparse.Namespace:
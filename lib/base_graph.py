@@ -1,30 +1,49 @@
-from typing import TypeVar
-from dataclasses import dataclass
-from collections import OrderedDict
+from typing import Iterator, TypeVar
+from dataclasses import dataclass, field
+from collections import deque
 
 T = TypeVar("T", bound="Graph")
 
 
-@dataclass
+@dataclass(slots=True)
 class Graph:
     nodes: set[int]
     adjacency_list: dict[int, list[int]]
+    # cached counts, kept up to date by add_edge / remove_edge.
+    # _num_edges counts the entries of the adjacency lists.
+    _size: int = field(init=False, repr=False, compare=False)
+    _num_edges: int = field(init=False, repr=False, compare=False)
+    # nodes whose adjacency list is shared with another graph, see
+    # connected_components. copied on the first add_edge / remove_edge.
+    _shared: set[int] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._size = len(self.nodes)
+        self._num_edges = sum(len(v) for v in self.adjacency_list.values())
+        self._shared = set()
 
     @property
     def size(self) -> int:
-        return len(self.nodes)
+        return self._size
 
-    @property
-    def edges(self) -> list[tuple[int, int]]:
-        edges = []
+    def iter_edges(self) -> Iterator[tuple[int, int]]:
+        """Yield the edges one by one, without building the whole list."""
         for n in self.nodes:
             for other in self.adjacency_list[n]:
-                edges.append((n, other))
-        return edges
+                yield (n, other)
+
+    @property
+    def edges(self) -> list[tuple[int, int]]:
+        """Deprecated: builds a new list on every access, prefer iter_edges."""
+        return [(n, other) for n in self.nodes for other in self.adjacency_list[n]]
 
     def __repr__(self) -> str:
         return f"<{self.__class__}, nodes:{self.nodes}, adjacencies: {self.adjacency_list}>"
 
+    def _visited_flags(self) -> bytearray:
+        """Return a zeroed flag per node id, nodes are small non negative ints."""
+        return bytearray(max(self.nodes, default=-1) + 1)
+
     ### Graph traversal
     def graph_traversal_dfs(self, start_node: int) -> list[int]:
         """Traverse the graph depth first starting at start_node.
@@ -33,21 +52,20 @@ class Graph:
         # DFS non-recursive.
         # for each step, get neighbor, visit, return
         # do not repeat nodes. there may be cycles!
-        visited_nodes = (
-            OrderedDict()
-        )  # we want to keep the order of the visited nodes, but also quick check for already visiteed
+        # one byte flag per node id for the quick check, the list keeps the visit order
+        visited = self._visited_flags()
+        visited_order = []
         to_visit_stack = [start_node]
 
         while to_visit_stack:
             current = to_visit_stack.pop()
             # avoid repeating nodes
-            if current in visited_nodes:
+            if visited[current]:
                 continue
-            # just adding the key to the dict, we dont care about value
-            visited_nodes[current] = 0
-            for neighbor in self.adjacency_list[current]:
-                to_visit_stack.append(neighbor)
-        return list(visited_nodes)
+            visited[current] = 1
+            visited_order.append(current)
+            to_visit_stack.extend(self.adjacency_list[current])
+        return visited_order
 
     def graph_traversal_bfs(self, start_node: int) -> list[int]:
         """Traverse the graph breadth first starting at start_node.
@@ -55,30 +73,71 @@ class Graph:
 
         # BFS non-recursive.
         # do not repeat nodes. there may be cycles!
-        visited_nodes = OrderedDict()
-        to_visit_queue = [start_node]
+        # one byte flag per node id for the quick check, the list keeps the visit order
+        visited = self._visited_flags()
+        visited_order = []
+        # deque gives O(1) pops from the front, list.insert(0, ...) is O(n)
+        to_visit_queue = deque([start_node])
 
         while to_visit_queue:
-            current = to_visit_queue.pop()
+            current = to_visit_queue.popleft()
             # avoid repeating nodes
-            if current in visited_nodes:
+            if visited[current]:
                 continue
 
-            visited_nodes[current] = 0
-            for neighbor in self.adjacency_list[current]:
-                to_visit_queue.insert(0, neighbor)
-        return list(visited_nodes)
+            visited[current] = 1
+            visited_order.append(current)
+            to_visit_queue.extend(self.adjacency_list[current])
+        return visited_order
+
+    def _count_reachable(self, start_node: int) -> int:
+        """Return how many nodes can be reached from start_node, itself included.
+
+        Same loop as graph_traversal_dfs, but only counts,
+        and stops once every node was seen."""
+        visited = self._visited_flags()
+        count = 0
+        to_visit_stack = [start_node]
+
+        while to_visit_stack:
+            current = to_visit_stack.pop()
+            if visited[current]:
+                continue
+            visited[current] = 1
+            count += 1
+            if count == self._size:
+                break
+            to_visit_stack.extend(self.adjacency_list[current])
+        return count
 
     def is_connected(self) -> bool:
         """Return true if g is a single connext component, False otherwise.
 
         If starting from any edge we can see every other, it is connected."""
-        return len(self.graph_traversal_dfs(0)) == self.size
+        if not self.nodes:
+            return True
+        # any node works as a start, node ids may not include 0
+        return self._count_reachable(next(iter(self.nodes))) == self._size
 
     @classmethod
     def from_edge_list(cls: type[T], n: int, edges: list[tuple[int, int]]) -> T:
         raise NotImplementedError("Subclasses must implement")
 
+    def add_edge(self, source: int, dest: int) -> None:
+        raise NotImplementedError("Subclasses must implement")
+
+    def remove_edge(self, source: int, dest: int) -> None:
+        raise NotImplementedError("Subclasses must implement")
+
+    def _own_neighbors(self, node: int) -> list[int]:
+        """Return the adjacency list of node to change it in place.
+
+        A list shared with another graph is replaced by a copy first, once."""
+        if node in self._shared:
+            self._shared.discard(node)
+            self.adjacency_list[node] = self.adjacency_list[node].copy()
+        return self.adjacency_list[node]
+
     def subgraph_from_nodes(self: T, nodes: list[int]) -> T:
         new_adjacency = {}
         for n in nodes:
@@ -87,14 +146,31 @@ class Graph:
 
     def connected_components(self: T) -> list[T]:
         """Return a list of Graphs, each represented a connected component of self.
-        if self.is_connected, then self.connectec_components == [self]"""
+        if self.is_connected, then self.connectec_components == [self]
+
+        The components share the adjacency lists of self instead of copying them.
+        add_edge / remove_edge copy a shared list before changing it, on either
+        side, so they only change the graph they are called on. changing a list
+        in place changes every graph sharing it, and leaves their cached edge
+        counts stale."""
         components: list[T] = []
-        # need to use all this nodes
-        nodes = self.nodes.copy()
-        while nodes:
-            current_start = nodes.pop()
+        # need to use all this nodes, flagged by node id
+        unvisited = self._visited_flags()
+        for n in self.nodes:
+            unvisited[n] = 1
+        # next unvisited node, bytearray.find scans in C
+        current_start = unvisited.find(1)
+        while current_start != -1:
             nodes_in_component = self.graph_traversal_dfs(current_start)
-            # build graph from nodes_in_component
-            components.append(self.subgraph_from_nodes(nodes_in_component))
-            nodes.difference_update(nodes_in_component)
+            # build graph from nodes_in_component, reusing the lists, no copies
+            component_adjacency = {
+                n: self.adjacency_list[n] for n in nodes_in_component
+            }
+            component = self.__class__(set(nodes_in_component), component_adjacency)
+            component._shared.update(nodes_in_component)
+            components.append(component)
+            for n in nodes_in_component:
+                unvisited[n] = 0
+            current_start = unvisited.find(1, current_start + 1)
+        self._shared.update(self.nodes)
         return components
@@ -1,31 +1,63 @@
+from array import array
+from itertools import accumulate
+
 from .base_graph import Graph
 
 
 ### Graph traversal
+# kept as functions for backwards compatibility, the implementation lives in Graph
 def graph_traversal_dfs(g: Graph, start_node: int) -> list[int]:
     """Traverse the graph depth first starting at start_node.
     return the list of visited nodes."""
+    return g.graph_traversal_dfs(start_node)
+
+
+def is_connected(g: Graph) -> bool:
+    """Return true if g is a single connext component, False otherwise."""
+    return g.is_connected()
+
+
+### CSR (compressed sparse row) representation
+def edge_list_to_csr(n: int, edges: list[tuple[int, int]]) -> tuple[array, array]:
+    """Build the CSR form of a directed edge list over nodes 0..n-1.
+
+    return (indptr, indices):
+    the neighbors of node u are indices[indptr[u]:indptr[u + 1]]."""
+
+    # pass 1: count the outflow of each node,
+    # the running sum gives where each node starts
+    counts = [0] * n
+    for source, _ in edges:
+        counts[source] += 1
+    indptr = array("l", accumulate(counts, initial=0))
+
+    # pass 2: scatter each edge in the slot of its source
+    indices = array("l", [0]) * indptr[n]
+    cursor = indptr[:-1]
+    for source, dest in edges:
+        indices[cursor[source]] = dest
+        cursor[source] += 1
+    return indptr, indices
+
+
+def graph_traversal_dfs_csr(
+    indptr: array, indices: array, start_node: int
+) -> list[int]:
+    """Traverse a CSR graph depth first starting at start_node.
+    return the list of visited nodes."""
 
-    # DFS non-recursive.
-    # for each step, get neighbor, visit, return
-    # do not repeat nodes. there may be cycles!
-    visited_nodes = set()
+    visited = bytearray(len(indptr) - 1)
+    visited_order = []
     to_visit_stack = [start_node]
 
     while to_visit_stack:
         current = to_visit_stack.pop()
         # avoid repeating nodes
-        if current in visited_nodes:
+        if visited[current]:
             continue
 
-        visited_nodes.add(current)
-        for neighbor in g.adjacency_list[current]:
-            to_visit_stack.append(neighbor)
-    return list(visited_nodes)
-
-
-def is_connected(g: Graph) -> bool:
-    """Return true if g is a single connext component, False otherwise.
-
-    If starting from any edge we can see every other, it is connected."""
-    return len(graph_traversal_dfs(g, 0)) == g.size
+        visited[current] = 1
+        visited_order.append(current)
+        # neighbors are a contiguous slice, extend in one go
+        to_visit_stack.extend(indices[indptr[current] : indptr[current + 1]])
+    return visited_order
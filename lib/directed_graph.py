@@ -1,10 +1,12 @@
+from array import array
 from dataclasses import dataclass
-from collections import defaultdict
+from collections import defaultdict, deque
 
 from .base_graph import Graph
+from .common import edge_list_to_csr
 
 
-@dataclass
+@dataclass(slots=True)
 class DirectedGraph(Graph):
     @classmethod
     def from_edge_list(cls, n: int, edges: list[tuple[int, int]]):
@@ -16,39 +18,58 @@ class DirectedGraph(Graph):
 
         return cls(nodes=set(range(n)), adjacency_list=dict(adjacency_list))
 
+    @classmethod
+    def from_edge_list_csr(
+        cls, n: int, edges: list[tuple[int, int]]
+    ) -> tuple[array, array]:
+        """Construct the CSR form (indptr, indices) of a graph from a list of edges.
+
+        Read only alternative to from_edge_list for traversal heavy work,
+        see common.graph_traversal_dfs_csr.
+        """
+        return edge_list_to_csr(n, edges)
+
     def num_edges(self) -> int:
-        edges = 0
-        for _, list_of_dest in self.adjacency_list.items():
-            for _ in list_of_dest:
-                edges += 1
-        return edges
+        return self._num_edges
+
+    def add_edge(self, source: int, dest: int) -> None:
+        """Add an edge from source to dest, both nodes must be in the graph."""
+        self._own_neighbors(source).append(dest)
+        self._num_edges += 1
+
+    def remove_edge(self, source: int, dest: int) -> None:
+        """Remove the edge from source to dest, raise ValueError if there is none."""
+        self._own_neighbors(source).remove(dest)
+        self._num_edges -= 1
 
     def has_cycles(self) -> bool:
         """Return True if the graph contains cycles"""
-        # for each node, do a dfs search. if at any moment we arrivee at the starting node, return true
-        # nodes contain the nodes that has not been explored
-        # if a node is not in nodes, means that there are no cycles from there on.
-        # if when traversing we find a node that is not in nodes, we dont have to explore the graph from there, since we have already done it.
-        remaining_nodes = self.nodes.copy()
+        # single pass DFS coloring the nodes:
+        # white: not explored yet, gray: in the current dfs path, black: fully explored.
+        # arriving at a gray node means we went back to a node of the current path,
+        # there is a cycle.
+        # black nodes have no cycles from there on, we dont have to explore them again.
+        white, gray, black = 0, 1, 2
+        color = self._visited_flags()
         for node in self.nodes:
-            current_path = set()
-            to_visit = [node]
-            while to_visit:
-                current = to_visit.pop()
-                # we are back at the start, there is a cycle
-                if current == node:
+            if color[node] != white:
+                continue
+            color[node] = gray
+            # each entry keeps the iterator of its remaining neighbors,
+            # so a node is expanded only once while it stays in the path
+            path_stack = [(node, iter(self.adjacency_list[node]))]
+            while path_stack:
+                current, neighbors = path_stack[-1]
+                neighbor = next(neighbors, None)
+                if neighbor is None:
+                    # explored everything reachable from current
+                    color[current] = black
+                    path_stack.pop()
+                elif color[neighbor] == gray:
                     return True
-
-                # we have explored the graph from this node at some point, and there is are no cycles
-                # if current not in remaining_nodes:
-                # continue
-
-                current_path.add(current)
-                for neighbor in self.adjacency_list[current]:
-                    to_visit.append(neighbor)
-
-            # we explored the graph starting from node and found no cycles
-            remaining_nodes.difference_update(current_path)
+                elif color[neighbor] == white:
+                    color[neighbor] = gray
+                    path_stack.append((neighbor, iter(self.adjacency_list[neighbor])))
         return False
 
     def topological_order(self) -> list[int]:
@@ -56,35 +77,29 @@ class DirectedGraph(Graph):
 
         Asume the graph is a single connected component and acyclic."""
 
-        # algorithm
-        # keep track of the "inverse" of the adjacency list, i.e. which nodes point to each node.
-        # iteratively, find a node with 0 inflow (0 nodes point it to it). add it to the ordering, and remove the edges to where it points.
+        # Kahn's algorithm
+        # keep track of the inflow of each node, i.e. how many nodes point to it.
+        # nodes with 0 inflow go to a queue. when a node is added to the ordering,
+        # remove its edges: the nodes it points to that drop to 0 inflow join the queue.
 
-        # compute inverse adjacency
-        # node_id: set of nodes it points too
-        inflow_list = {node: set() for node in self.nodes}
+        # node_id: number of nodes pointing to it
+        inflow = {node: 0 for node in self.nodes}
         for node in self.nodes:
             for neighbor in self.adjacency_list[node]:
-                # node points to neighbor
-                inflow_list[neighbor].add(node)
+                inflow[neighbor] += 1
 
+        to_visit = deque(node for node in self.nodes if inflow[node] == 0)
         ordering = []
-        while inflow_list:
-            # find node with 0 inflow, add to ordering, remove
-            node_0_inflow = None
-            for node, inflow in inflow_list.items():
-                if not inflow:
-                    node_0_inflow = node
-                    break
-            if node_0_inflow is None:
-                raise Exception(
-                    "Graph has cycles"
-                )  # we havent found any node with 0 inflow. cycles!
-
-            ordering.append(node_0_inflow)
-            # remove node from the remaining, and its connections
-            del inflow_list[node_0_inflow]
-            for neighbor in self.adjacency_list[node_0_inflow]:
-                inflow_list[neighbor].remove(node_0_inflow)
+        while to_visit:
+            node = to_visit.popleft()
+            ordering.append(node)
+            for neighbor in self.adjacency_list[node]:
+                inflow[neighbor] -= 1
+                if inflow[neighbor] == 0:
+                    to_visit.append(neighbor)
+
+        if len(ordering) != self.size:
+            # some nodes never got to 0 inflow. cycles!
+            raise Exception("Graph has cycles")
 
         return ordering
@@ -1,2 +1,12 @@
-def manhattan_distance(source: tuple[int, int], dest: tuple[int, int]) -> int:
-    return abs(dest[0] - source[0]) + abs(dest[1] - source[1])
+def manhattan_distance_table(
+    rows: int, cols: int, dest_row: int, dest_col: int
+) -> list[int]:
+    """Manhattan distance from every cell of a rows x cols grid to (dest_row, dest_col).
+
+    Flat and row major, cell (row, col) is at row * cols + col."""
+    col_distances = [abs(dest_col - col) for col in range(cols)]
+    table = []
+    for row in range(rows):
+        row_distance = abs(dest_row - row)
+        table.extend([row_distance + distance for distance in col_distances])
+    return table
@@ -1,10 +1,12 @@
-from dataclasses import dataclass, field
+import base64
 import json
 from enum import IntEnum, auto
 import random
 import heapq
+from collections import deque
+from itertools import compress, pairwise
 
-from .distance_utils import manhattan_distance
+from .distance_utils import manhattan_distance_table
 
 
 class CellState(IntEnum):
@@ -16,29 +18,71 @@ class CellState(IntEnum):
     GOAL = auto()
 
 
-DIRECTIONS = [(0, 1), (1, 0), (0, -1), (-1, 0)]
+DIRECTIONS = ((0, 1), (1, 0), (0, -1), (-1, 0))
+
+# plain int copies of the states tested in the search loops, one global lookup
+# instead of global + enum attribute, and int to int compares
+_INACTIVE = int(CellState.INACTIVE)
+_SLOW = int(CellState.SLOW)
+
+# find_path_jps, bytes.translate tables from states to "0" / "1" bit chars,
+# and from bit chars back to flags
+_OPEN_AS_BIT_CHAR = bytes(
+    ord("0" if state == _INACTIVE else "1") for state in range(256)
+)
+_BIT_CHAR_AS_FLAG = bytes.maketrans(b"01", b"\x00\x01")
+# directions to jump to from a jump point, by the direction it was reached from,
+# see find_path_jps. keep going, or turn to either side. never back, the parent
+# covered that. the start has no direction, it jumps all ways
+_JUMP_DIRECTIONS = ((0, 1, 2, 3),) + tuple(
+    (direction, (direction + 1) % 4, (direction + 3) % 4) for direction in range(4)
+)
+
+# bytes.translate table: 1 for the states a cell can be made inactive from
+_CAN_BE_INACTIVE = bytes(
+    state not in (CellState.CURRENT, CellState.GOAL, CellState.INACTIVE)
+    for state in range(256)
+)
+
+# cost of moving into a cell, indexed by its state. 0 for the cells that cant be walked
+_COST_BY_STATE = tuple(
+    {
+        CellState.ACTIVE: 1,
+        CellState.SLOW: 5,
+        CellState.CURRENT: 1,
+        CellState.VISITED: 1,
+        CellState.GOAL: 1,
+    }.get(state, 0)
+    for state in range(max(CellState) + 1)
+)
 
 
-@dataclass
 class Cell:
-    state: CellState = CellState.ACTIVE
-    prev_state: CellState | None = None
+    """View over one square of a GridGraph.
+
+    The states live in the byte arrays of the grid, a cell only knows its index."""
+
+    __slots__ = ("_grid", "_index")
+
+    def __init__(self, grid: "GridGraph", index: int) -> None:
+        self._grid = grid
+        self._index = index
+
+    @property
+    def state(self) -> CellState:
+        return CellState(self._grid._state[self._index])
+
+    @state.setter
+    def state(self, new_state: CellState) -> None:
+        self._grid._state[self._index] = new_state
 
     def change_state(self, new_state: CellState):
-        self.prev_state = self.state
         self.state = new_state
 
-    def revert_state(self):
-        if not self.prev_state:
-            raise Exception("no prev state")
-        self.state = self.prev_state
-
     def make_current(self):
-        self.prev_state = self.state
         self.state = CellState.CURRENT
 
     def make_goal(self):
-        self.prev_state = self.state
         self.state = CellState.GOAL
 
     def flip_active(self):
@@ -50,21 +94,10 @@ class Cell:
         )
 
     def cell_cost(self) -> int:
-        match self.state:
-            case CellState.ACTIVE | CellState.CURRENT | CellState.GOAL:
-                return 1
-            case CellState.SLOW:
-                return 5
-            case _:
-                raise Exception()
-
-
-@dataclass(order=True)
-class PrioritizedNeighbor:
-    """Used in priority queues to sort neighbors by distance to goal."""
-
-    distance: int
-    position: tuple[int, int]
+        cost = _COST_BY_STATE[self._grid._state[self._index]]
+        if not cost:
+            raise Exception(f"{self.state.name} cells have no cost")
+        return cost
 
 
 class GridGraph:
@@ -76,11 +109,20 @@ class GridGraph:
         goal_position: tuple[int, int] | None = None,
         inactives: list[tuple[int, int]] = None,
     ) -> None:
-        self._cells = [[Cell() for _ in range(height)] for _ in range(width)]
         self._current = None
         self._width = width
         self._height = height
 
+        # one byte per cell, row major, with a border of INACTIVE cells all around,
+        # so neighbor lookups never go out of bounds. see _index for the layout.
+        self._stride = width + 2
+        self._state = bytearray([CellState.INACTIVE]) * (self._stride * (height + 2))
+        for row in range(height):
+            start = self._index(row, 0)
+            self._state[start : start + width] = bytes([CellState.ACTIVE]) * width
+        # (target index, distances) of the last _distances_to call
+        self._distances_cache: tuple[int, list[int]] | None = None
+
         if initial_position:
             self.set_current(*initial_position)
 
@@ -92,80 +134,100 @@ class GridGraph:
             for i, j in inactives:
                 self.at(i, j).change_state(CellState.INACTIVE)
 
+    @property
+    def current(self) -> tuple[int, int] | None:
+        return self._current
+
+    def _index(self, row: int, col: int) -> int:
+        """Position of cell (row, col) in the state arrays, skipping the border.
+
+        Raise IndexError for cells outside the grid, they would land on the border."""
+        if not (0 <= row < self._height and 0 <= col < self._width):
+            raise IndexError(f"cell ({row}, {col}) is outside the grid")
+        return (row + 1) * self._stride + col + 1
+
+    def _coords(self, index: int) -> tuple[int, int]:
+        """Inverse of _index."""
+        row, col = divmod(index, self._stride)
+        return row - 1, col - 1
+
+    def _distances_to(self, target: int) -> list[int]:
+        """Manhattan distance from every cell to target, indexed like the state arrays.
+
+        Only depends on the grid size,
+        the table for the last target is kept for the next search.
+        """
+        if self._distances_cache is None or self._distances_cache[0] != target:
+            target_row, target_col = divmod(target, self._stride)
+            table = manhattan_distance_table(
+                self._height + 2, self._stride, target_row, target_col
+            )
+            self._distances_cache = (target, table)
+        return self._distances_cache[1]
+
     def path_cost(self, path: list[tuple[int, int]]):
         return sum([self.at(i, j).cell_cost() for i, j in path])
 
+    def _inactive_candidates(self, path: list[tuple[int, int]]) -> list[int]:
+        """Return the indexes of the cells outside path that can be made inactive."""
+        # translate maps every state byte to its flag in one C level pass
+        candidates = self._state.translate(_CAN_BE_INACTIVE)
+        for i, j in path:
+            candidates[self._index(i, j)] = 0
+        return list(compress(range(len(candidates)), candidates))
+
     def add_n_inactives(self, n: int):
         """Adds n inactive squares to the map, ensuring that there is always at least 1 path from initial to goal"""
-        path = set(self.find_path_greedy_semirandom_bfs())
-        inactives_set = set()
-        all_possibe = [
-            (i, j)
-            for i in range(self._height)
-            for j in range(self._width)
-            if (i, j) not in path
-            and self.at(i, j).state
-            not in {
-                CellState.CURRENT,
-                CellState.GOAL,
-                CellState.INACTIVE,
-            }
-        ]
+        path = self.find_path_greedy_semirandom_bfs()
+        all_possibe = self._inactive_candidates(path)
 
         if n > len(all_possibe):
             n = len(all_possibe)
-        inactives_set = random.sample(all_possibe, n)
-        for i, j in inactives_set:
-            self.at(i, j).change_state(CellState.INACTIVE)
+        for index in random.sample(all_possibe, n):
+            Cell(self, index).change_state(CellState.INACTIVE)
 
     def make_n_paths(self, n: int):
         """
         Marks most of the squares as inactives, but leaves at least n random paths from source to dest
         """
-        path = set()
+        path = []
         for _ in range(n):
-            path.update(self.find_path_greedy_semirandom_bfs(0.84))
-
-        all_possibe = [
-            (i, j)
-            for i in range(self._height)
-            for j in range(self._width)
-            if (i, j) not in path
-            and self.at(i, j).state
-            not in {
-                CellState.CURRENT,
-                CellState.GOAL,
-                CellState.INACTIVE,
-            }
-        ]
+            path.extend(self.find_path_greedy_semirandom_bfs(0.84))
 
-        for i, j in all_possibe:
-            self.at(i, j).change_state(CellState.INACTIVE)
+        for index in self._inactive_candidates(path):
+            Cell(self, index).change_state(CellState.INACTIVE)
 
     def at(self, row: int, col: int) -> Cell:
-        return self._cells[col][row]
-
-    def neighbors(self, row, col, *, shuffle: bool = True) -> list[tuple[int, int]]:
-        ns = []
-        for i, j in DIRECTIONS:
-            new_i = row + i
-            new_j = col + j
-            if (
-                (0 <= new_i < self._height)
-                and (0 <= new_j < self._width)
-                and (self.at(new_i, new_j).state != CellState.INACTIVE)
-            ):
-                ns.append((new_i, new_j))
+        return Cell(self, self._index(row, col))
+
+    def neighbors(self, row, col, *, shuffle: bool = False) -> list[tuple[int, int]]:
+        """Return the non inactive neighbors of (row, col).
+
+        In DIRECTIONS order unless shuffled."""
+        ns = [
+            self._coords(index)
+            for index in self._neighbor_indexes(self._index(row, col))
+        ]
         if shuffle:
             random.shuffle(ns)
         return ns
 
+    def _neighbor_indexes(self, index: int) -> list[int]:
+        """Same as neighbors, with state array indexes and in DIRECTIONS order."""
+        state = self._state
+        stride = self._stride
+        # the border is INACTIVE, no bounds checks needed
+        return [
+            neighbor
+            for neighbor in (index + 1, index + stride, index - 1, index - stride)
+            if state[neighbor] != _INACTIVE
+        ]
+
     def set_current(self, row: int, col: int) -> None:
         prev_current = self._current
         self._current = row, col
         self.at(row, col).make_current()
         if prev_current:
-            self.at(*prev_current).revert_state()
             self.at(*prev_current).change_state(CellState.VISITED)
 
     def move_current(self, direction: tuple[int, int]) -> None:
@@ -188,28 +250,37 @@ class GridGraph:
         """finds a path from current to goal.
         returns the coordinates of the visited nodes."""
 
+        # works on state array indexes, coordinates are only rebuilt for the result.
+        start = self._index(*self._current)
+        goal = self._index(*self._goal)
+
+        if start == goal:
+            return [self._current]
+
         # contains node, previous
-        path: list[tuple[int, int]] = []
-        visited = set()
+        path: list[int] = []
+        # one flag per cell
+        visited = bytearray(len(self._state))
+        visited[start] = 1
 
-        # queue
-        to_visit = [self._current]
+        # queue, deque pops from the front in O(1)
+        to_visit = deque([start])
 
         while to_visit:
-            current = to_visit.pop()
+            current = to_visit.popleft()
 
             # visit current
             path.append(current)
 
-            if current == self._goal:
-                # found the goal!
-                return path
-
             # queue all neighbors
-            for neighbor in self.neighbors(*current):
-                if neighbor not in visited:
-                    visited.add(neighbor)
-                    to_visit.insert(0, neighbor)
+            for neighbor in self._neighbor_indexes(current):
+                if not visited[neighbor]:
+                    if neighbor == goal:
+                        # found the goal! no need to wait until it leaves the queue
+                        path.append(neighbor)
+                        return [self._coords(index) for index in path]
+                    visited[neighbor] = 1
+                    to_visit.append(neighbor)
 
         return None  # didnt found a path to the goal
 
@@ -217,11 +288,19 @@ class GridGraph:
         """finds a path from current to goal.
         returns the coordinates of the visited nodes."""
 
+        # works on state array indexes, coordinates are only rebuilt for the result.
+        start = self._index(*self._current)
+        goal = self._index(*self._goal)
+
+        if start == goal:
+            return [self._current]
+
         path = []
-        visited = set()
+        # one flag per cell
+        visited = bytearray(len(self._state))
 
         # queue
-        to_visit = [self._current]
+        to_visit = [start]
 
         while to_visit:
             current = to_visit.pop()
@@ -229,14 +308,17 @@ class GridGraph:
             # visit current
             path.append(current)
 
-            if current == self._goal:
-                # found the goal!
-                return path
-
             # queue all neighbors
-            for neighbor in self.neighbors(*current, shuffle=random_neighbor):
-                if neighbor not in visited:
-                    visited.add(neighbor)
+            neighbors = self._neighbor_indexes(current)
+            if random_neighbor:
+                random.shuffle(neighbors)
+            for neighbor in neighbors:
+                if not visited[neighbor]:
+                    if neighbor == goal:
+                        # found the goal! no need to wait until it leaves the stack
+                        path.append(neighbor)
+                        return [self._coords(index) for index in path]
+                    visited[neighbor] = 1
                     to_visit.append(neighbor)
 
         # visited all the accesible nodes, didnt found path :(
@@ -246,39 +328,40 @@ class GridGraph:
         """finds a path from current to goal.
         returns the coordinates of the visited nodes."""
 
-        # contains node, previous
-        path: list[tuple[int, int]] = []
-        visited = set()
+        # works on state array indexes, coordinates are only rebuilt for the result.
+        # heap entries are single ints, distance << index_bits | index: they sort by
+        # distance then index, and compare natively with no tuple allocated per push.
+        index_bits = len(self._state).bit_length()
+        index_mask = (1 << index_bits) - 1
+        start = self._index(*self._current)
+        goal = self._index(*self._goal)
+        distances = self._distances_to(goal)
+
+        path: list[int] = []
+        # one flag per cell
+        visited = bytearray(len(self._state))
+        visited[start] = 1
 
         # queue
-        to_visit = [
-            PrioritizedNeighbor(
-                manhattan_distance(self._current, self._goal),
-                self._current,
-            )
-        ]
+        to_visit = [distances[start] << index_bits | start]
 
         while to_visit:
-            current = heapq.heappop(to_visit).position
+            current = heapq.heappop(to_visit) & index_mask
 
             # visit current
             path.append(current)
 
-            if current == self._goal:
+            if current == goal:
                 # found the goal!
-                return path
+                return [self._coords(index) for index in path]
 
             # queue all neighbors
-            for neighbor in self.neighbors(*current):
-                if neighbor not in visited:
-                    visited.add(neighbor)
+            for neighbor in self._neighbor_indexes(current):
+                if not visited[neighbor]:
+                    visited[neighbor] = 1
                     # keep to_visit sorted by manhattan distance to the goal
                     heapq.heappush(
-                        to_visit,
-                        PrioritizedNeighbor(
-                            manhattan_distance(neighbor, self._goal),
-                            neighbor,
-                        ),
+                        to_visit, distances[neighbor] << index_bits | neighbor
                     )
         return None  # didnt found a path to the goal
 
@@ -290,111 +373,415 @@ class GridGraph:
         half greedy half random: when pickhing which node to visit next, sometimes pick a random one
         returns the coordinates of the visited nodes."""
 
+        # heap entries are single ints, see find_path_greedy_bfs
+        index_bits = len(self._state).bit_length()
+        index_mask = (1 << index_bits) - 1
+        start = self._index(*self._current)
+        goal = self._index(*self._goal)
+        distances = self._distances_to(goal)
+
         # contains node, previous
-        path: list[tuple[int, int]] = []
-        visited = set()
+        path: list[int] = []
+        # one flag per cell
+        visited = bytearray(len(self._state))
 
         # queue
-        to_visit = [
-            PrioritizedNeighbor(
-                manhattan_distance(self._current, self._goal),
-                self._current,
-            )
-        ]
+        to_visit = [distances[start] << index_bits | start]
         steps = 0
         while to_visit:
             steps += 1
             # if random.random() > random_ratio:
             if steps > 10:
                 # use node with best heuristic
-                current = heapq.heappop(to_visit).position
+                current = heapq.heappop(to_visit) & index_mask
             else:
-                # random node in the list to visit
-                current = to_visit.pop(random.randrange(len(to_visit))).position
-                # may have been de-heaped
-                heapq.heapify(to_visit)
+                # random node in the list to visit.
+                # move the last node into its slot,
+                # and restore the heap from there, O(log n)
+                chosen = random.randrange(len(to_visit))
+                last = to_visit.pop()
+                if chosen == len(to_visit):
+                    current = last & index_mask
+                else:
+                    current = to_visit[chosen] & index_mask
+                    to_visit[chosen] = last
+                    # the moved node may belong below or above its new slot
+                    heapq._siftup(to_visit, chosen)
+                    heapq._siftdown(to_visit, 0, chosen)
 
             # visit current
             path.append(current)
 
-            if current == self._goal:
+            if current == goal:
                 # found the goal!
-                return path
+                return [self._coords(index) for index in path]
 
             # queue all neighbors
-            for neighbor in self.neighbors(*current):
-                if neighbor not in visited:
-                    visited.add(neighbor)
+            neighbors = self._neighbor_indexes(current)
+            random.shuffle(neighbors)
+            for neighbor in neighbors:
+                if not visited[neighbor]:
+                    visited[neighbor] = 1
                     # keep to_visit sorted by manhattan distance to the goal
                     heapq.heappush(
-                        to_visit,
-                        PrioritizedNeighbor(
-                            manhattan_distance(neighbor, self._goal),
-                            neighbor,
-                        ),
+                        to_visit, distances[neighbor] << index_bits | neighbor
                     )
         return None  # didnt found a path to the goal
 
-    def find_path_greedy_bfs(self) -> list[tuple[int, int]]:
-        """finds a path from current to goal.
-        returns the coordinates of the visited nodes."""
+    def find_path_astar(self) -> list[tuple[int, int]]:
+        """finds the cheapest path from current to goal.
 
-        # contains node, previous
-        path: list[tuple[int, int]] = []
-        visited = set()
+        A*: expands the node with the lowest cost so far + manhattan distance to the
+        goal, so unlike the greedy search it takes the cost of the slow cells into
+        account.
+        returns the coordinates of the path, from current to goal."""
 
-        # queue
-        to_visit = [
-            PrioritizedNeighbor(
-                manhattan_distance(self._current, self._goal),
-                self._current,
-            )
-        ]
+        state = self._state
+        # heap entries are single ints, see find_path_greedy_bfs
+        index_bits = len(state).bit_length()
+        index_mask = (1 << index_bits) - 1
+        start = self._index(*self._current)
+        goal = self._index(*self._goal)
+        distances = self._distances_to(goal)
 
-        while to_visit:
-            current = heapq.heappop(to_visit).position
+        # cost from current, and previous node in the cheapest path found so far
+        costs = [float("inf")] * len(state)
+        came_from = [-1] * len(state)
+        costs[start] = 0
+        # flag per cell, set once expanded
+        closed = bytearray(len(state))
 
-            # visit current
-            path.append(current)
-
-            if current == self._goal:
-                # found the goal!
-                return path
+        # queue of cost + distance to the goal, and index
+        to_visit = [distances[start] << index_bits | start]
 
-            # queue all neighbors
-            for neighbor in self.neighbors(*current):
-                if neighbor not in visited:
-                    visited.add(neighbor)
-                    # keep to_visit sorted by manhattan distance to the goal
+        while to_visit:
+            current = heapq.heappop(to_visit) & index_mask
+            if current == goal:
+                break
+            if closed[current]:
+                # already expanded through a cheaper entry
+                continue
+            closed[current] = 1
+
+            current_cost = costs[current]
+            for neighbor in self._neighbor_indexes(current):
+                new_cost = current_cost + _COST_BY_STATE[state[neighbor]]
+                if new_cost < costs[neighbor]:
+                    costs[neighbor] = new_cost
+                    came_from[neighbor] = current
+                    estimate = new_cost + distances[neighbor]
+                    heapq.heappush(to_visit, estimate << index_bits | neighbor)
+        else:
+            return None  # didnt found a path to the goal
+
+        # walk back from the goal
+        path = [goal]
+        while path[-1] != start:
+            path.append(came_from[path[-1]])
+        path.reverse()
+        return [self._coords(index) for index in path]
+
+    def find_path_bidir_astar(self) -> list[tuple[int, int]]:
+        """finds the cheapest path from current to goal.
+
+        bidirectional A*: one search goes forward from current to goal, another
+        backward from goal to current, alternating expansions. stops once no open node
+        can beat the best path found where both searches meet.
+        returns the coordinates of the path, from current to goal."""
+
+        state = self._state
+        stride = self._stride
+        # heap entries are single ints, see find_path_greedy_bfs
+        index_bits = len(state).bit_length()
+        index_mask = (1 << index_bits) - 1
+        start = self._index(*self._current)
+        goal = self._index(*self._goal)
+        if start == goal:
+            return [self._coords(start)]
+
+        # index 0 is the forward search, 1 the backward one.
+        # row and col of the target of each, shifted by the border
+        targets = (divmod(goal, stride), divmod(start, stride))
+        # cost from the origin of each search, and previous node in its path
+        inf = float("inf")
+        costs = ([inf] * len(state), [inf] * len(state))
+        costs[0][start] = 0
+        costs[1][goal] = 0
+        came_from = ([-1] * len(state), [-1] * len(state))
+        # flag per cell, set once expanded
+        closed = (bytearray(len(state)), bytearray(len(state)))
+        # priority queues keyed on cost + manhattan distance to the target
+        # the start and goal shift by the same border, their distance does not change
+        (goal_row, goal_col), (start_row, start_col) = targets
+        distance = abs(goal_row - start_row) + abs(goal_col - start_col)
+        to_visit = ([distance << index_bits | start], [distance << index_bits | goal])
+
+        best_cost = inf
+        meeting = -1
+        direction = 0
+        while to_visit[0] and to_visit[1]:
+            # the heads are lower bounds for any path not found yet
+            if max(to_visit[0][0], to_visit[1][0]) >> index_bits >= best_cost:
+                break
+
+            current = heapq.heappop(to_visit[direction]) & index_mask
+            if not closed[direction][current]:
+                closed[direction][current] = 1
+                own_costs = costs[direction]
+                other_costs = costs[1 - direction]
+                target_row, target_col = targets[direction]
+                current_cost = own_costs[current]
+
+                for neighbor in self._neighbor_indexes(current):
+                    # moving forward into a cell costs that cell,
+                    # backward we are leaving current to get into it.
+                    step = neighbor if direction == 0 else current
+                    new_cost = current_cost + _COST_BY_STATE[state[step]]
+                    if new_cost >= own_costs[neighbor]:
+                        continue
+
+                    own_costs[neighbor] = new_cost
+                    came_from[direction][neighbor] = current
+                    neighbor_row, neighbor_col = divmod(neighbor, stride)
+                    # manhattan distance inlined, it runs for every push
+                    estimate = (
+                        new_cost
+                        + abs(neighbor_row - target_row)
+                        + abs(neighbor_col - target_col)
+                    )
                     heapq.heappush(
-                        to_visit,
-                        PrioritizedNeighbor(
-                            manhattan_distance(neighbor, self._goal),
-                            neighbor,
-                        ),
+                        to_visit[direction], estimate << index_bits | neighbor
                     )
-        return None  # didnt found a path to the goal
+
+                    # the other search got here too, there is a path through neighbor
+                    if new_cost + other_costs[neighbor] < best_cost:
+                        best_cost = new_cost + other_costs[neighbor]
+                        meeting = neighbor
+
+            direction = 1 - direction
+
+        if meeting == -1:
+            return None  # didnt found a path to the goal
+
+        # walk back to current, then forward to the goal
+        path = []
+        node = meeting
+        while node != -1:
+            path.append(node)
+            node = came_from[0][node]
+        path.reverse()
+        node = came_from[1][meeting]
+        while node != -1:
+            path.append(node)
+            node = came_from[1][node]
+        return [self._coords(index) for index in path]
+
+    def _jump_flags(self, goal: int) -> tuple[bytes, bytes, bytes]:
+        """Where the jumps of find_path_jps stop, as flags for bytes.find.
+
+        A vertical jump stops at the goal, or at a cell with a forced neighbor: open to
+        a side that was blocked one row back, so only a path through this cell gets
+        there that fast. A horizontal jump stops at the goal, or at a cell where a
+        vertical jump finds a stop. Blocked cells are flagged too, a jump that finds one
+        got nowhere.
+
+        Returns (stop_side, stop_down, stop_up). stop_side is row major like the state
+        array, the vertical ones are column major, cell (row, col) of the padded grid
+        is at col * rows + row, so columns are contiguous for find too.
+
+        Computed over the whole grid at once, as ints with one bit per cell: shifting
+        by 1 moves a column, by stride moves a row."""
+        state = self._state
+        stride = self._stride
+        size = len(state)
+        all_cells = (1 << size) - 1
+
+        open_cells = int(state.translate(_OPEN_AS_BIT_CHAR)[::-1], 2)
+        blocked = ~open_cells & all_cells
+        goal_bit = 1 << goal
+
+        # side open here, and blocked on the previous row of the jump
+        stop_down = (
+            (open_cells << 1) & (blocked << (stride + 1))
+            | (open_cells >> 1) & (blocked << (stride - 1))
+            | goal_bit
+        ) & open_cells
+        stop_up = (
+            (open_cells << 1) & (blocked >> (stride - 1))
+            | (open_cells >> 1) & (blocked >> (stride + 1))
+            | goal_bit
+        ) & open_cells
+
+        # cells whose vertical jump finds a stop: the next cell is a stop, or it is
+        # open and its own jump finds one. doubling the shift every round, a column
+        # takes log(rows) rounds
+        found_down, through_down = stop_down >> stride, open_cells >> stride
+        found_up, through_up = stop_up << stride, open_cells << stride
+        shift = stride
+        while shift < size:
+            found_down |= through_down & (found_down >> shift)
+            through_down &= through_down >> shift
+            found_up |= through_up & (found_up << shift)
+            through_up &= through_up << shift
+            shift *= 2
+        stop_side = (found_down | found_up) & open_cells | goal_bit
+
+        def to_flags(bits: int) -> bytes:
+            return (
+                format(bits & all_cells, f"0{size}b")
+                .encode()[::-1]
+                .translate(_BIT_CHAR_AS_FLAG)
+            )
+
+        def by_column(flags: bytes) -> bytes:
+            return b"".join(flags[col::stride] for col in range(stride))
+
+        return (
+            to_flags(stop_side | blocked),
+            by_column(to_flags(stop_down | blocked)),
+            by_column(to_flags(stop_up | blocked)),
+        )
+
+    def find_path_jps(self) -> list[tuple[int, int]]:
+        """finds the cheapest path from current to goal.
+
+        jump point search: A* that only pushes jump points, the cells where a path may
+        turn, jumping over the straight runs in between. only valid if every step costs
+        the same, falls back to find_path_astar when there are slow cells.
+        returns the coordinates of the path, from current to goal."""
+
+        if _SLOW in self._state:
+            return self.find_path_astar()
+
+        state = self._state
+        stride = self._stride
+        rows = len(state) // stride
+        # heap entries are single ints, see find_path_greedy_bfs
+        index_bits = len(state).bit_length()
+        index_mask = (1 << index_bits) - 1
+        start = self._index(*self._current)
+        goal = self._index(*self._goal)
+        distances = self._distances_to(goal)
+        stop_side, stop_down, stop_up = self._jump_flags(goal)
+
+        # cost from current, and previous jump point in the cheapest path found so far
+        costs = [float("inf")] * len(state)
+        came_from = [-1] * len(state)
+        costs[start] = 0
+        # direction each jump point was reached from,
+        # 1 + position in DIRECTIONS, 0 at the start
+        arrived = bytearray(len(state))
+        # flag per cell, set once expanded
+        closed = bytearray(len(state))
+
+        # queue of cost + distance to the goal, and index
+        to_visit = [distances[start] << index_bits | start]
+
+        while to_visit:
+            current = heapq.heappop(to_visit) & index_mask
+            if current == goal:
+                break
+            if closed[current]:
+                # already expanded through a cheaper entry
+                continue
+            closed[current] = 1
+
+            current_cost = costs[current]
+            row, col = divmod(current, stride)
+            column_index = col * rows + row
+            for direction in _JUMP_DIRECTIONS[arrived[current]]:
+                # first flagged cell in the direction, the border stops every search
+                if direction == 0:
+                    jump_point = stop_side.find(1, current + 1)
+                elif direction == 2:
+                    jump_point = stop_side.rfind(1, 0, current)
+                elif direction == 1:
+                    found = stop_down.find(1, column_index + 1)
+                    jump_point = current + (found - column_index) * stride
+                else:
+                    found = stop_up.rfind(1, 0, column_index)
+                    jump_point = current + (found - column_index) * stride
+                if state[jump_point] == _INACTIVE:
+                    continue
+                # jumps are straight lines, one unit of cost per cell
+                new_cost = current_cost + abs(jump_point - current) // (
+                    1 if direction % 2 == 0 else stride
+                )
+                if new_cost < costs[jump_point]:
+                    costs[jump_point] = new_cost
+                    came_from[jump_point] = current
+                    arrived[jump_point] = direction + 1
+                    estimate = new_cost + distances[jump_point]
+                    heapq.heappush(to_visit, estimate << index_bits | jump_point)
+        else:
+            return None  # didnt found a path to the goal
+
+        # walk back from the goal through the jump points
+        jump_points = [goal]
+        while jump_points[-1] != start:
+            jump_points.append(came_from[jump_points[-1]])
+        jump_points.reverse()
+
+        # and fill in the cells jumped over
+        path = [start]
+        for source, dest in pairwise(jump_points):
+            step = stride if abs(dest - source) >= stride else 1
+            if dest < source:
+                step = -step
+            path.extend(range(source + step, dest + step, step))
+        return [self._coords(index) for index in path]
+
+    # version of the to_dict layout. dicts with no "format" are version 1,
+    # where cells is a list of columns of CellState names.
+    DICT_FORMAT = 2
 
     def to_dict(self) -> dict:
-        """Serialize the grid to a dictionary."""
+        """Serialize the grid to a dictionary.
+
+        cells holds the state byte of every cell, row major and without the border,
+        base64 encoded."""
+        width = self._width
+        stride = self._stride
+        # rows start after the top border row and the left border cell
+        cells = b"".join(
+            self._state[start : start + width]
+            for start in range(stride + 1, stride * (self._height + 1), stride)
+        )
         return {
-            "width": self._width,
+            "format": self.DICT_FORMAT,
+            "width": width,
             "height": self._height,
-            "cells": [[cell.state.name for cell in col] for col in self._cells],
+            "cells": base64.b64encode(cells).decode("ascii"),
             "current": self._current,
             "goal": self._goal,
         }
 
     @classmethod
     def from_dict(cls, data: dict):
-        """Deserialize a grid from a dictionary."""
+        """Deserialize a grid from a dictionary, in any format to_dict ever wrote."""
         grid = cls(
             width=data["width"],
             height=data["height"],
             initial_position=data.get("current"),
             goal_position=data.get("goal"),
         )
-        for col_idx, col in enumerate(data["cells"]):
-            for row_idx, state_name in enumerate(col):
-                grid._cells[col_idx][row_idx].state = CellState[state_name]
+        data_format = data.get("format", 1)
+        if data_format == 1:
+            for col_idx, col in enumerate(data["cells"]):
+                for row_idx, state_name in enumerate(col):
+                    grid._state[grid._index(row_idx, col_idx)] = CellState[state_name]
+        elif data_format == 2:
+            width = grid._width
+            cells = base64.b64decode(data["cells"])
+            if len(cells) != width * grid._height:
+                raise ValueError(
+                    f"expected {width * grid._height} cells, got {len(cells)}"
+                )
+            for row in range(grid._height):
+                start = grid._index(row, 0)
+                grid._state[start : start + width] = cells[
+                    row * width : (row + 1) * width
+                ]
+        else:
+            raise ValueError(f"unknown grid format {data_format}")
         return grid
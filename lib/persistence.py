@@ -14,14 +14,13 @@ def save_grid_to_json(g: GridGraph, filepath: str | Path | None = None):
         raise FileExistsError(f"File {filepath} already exists.")
     elif not filepath.parent.exists():
         raise FileNotFoundError(f"Parent directory {filepath.parent} does not exist.")
-    with filepath.open("w") as f:
-        json.dump(g.to_dict(), f)
+    # one write of the whole document, compact separators keep the file small
+    filepath.write_text(json.dumps(g.to_dict(), separators=(",", ":")))
 
     print(f"saved grid to {filepath}")
 
 
-def load_grid_from_json(filepath: str) -> GridGraph:
+def load_grid_from_json(filepath: str | Path) -> GridGraph:
     """Load the grid from a JSON file."""
-    with open(filepath, "r") as f:
-        data = json.load(f)
+    data = json.loads(Path(filepath).read_bytes())
     return GridGraph.from_dict(data)
@@ -1,10 +1,12 @@
+from array import array
 from dataclasses import dataclass
 from collections import defaultdict
 
 from .base_graph import Graph
+from .common import edge_list_to_csr
 
 
-@dataclass
+@dataclass(slots=True)
 class UndirectedGraph(Graph):
     @classmethod
     def from_edge_list(cls, n: int, edges: list[tuple[int, int]]):
@@ -19,19 +21,58 @@ class UndirectedGraph(Graph):
 
         return cls(nodes=nodes, adjacency_list=dict(adjacency_list))
 
+    @classmethod
+    def from_edge_list_csr(
+        cls, n: int, edges: list[tuple[int, int]]
+    ) -> tuple[array, array]:
+        """Construct the CSR form (indptr, indices) of a graph from a list of edges.
+
+        Read only alternative to from_edge_list for traversal heavy work,
+        see common.graph_traversal_dfs_csr. Each edge is stored in both directions,
+        neighbors come in the same order as from_edge_list.
+        """
+        both_ways = [
+            edge for source, dest in edges for edge in ((source, dest), (dest, source))
+        ]
+        return edge_list_to_csr(n, both_ways)
+
     def num_edges(self) -> int:
-        edges = 0
-        for source, list_of_dest in self.adjacency_list.items():
-            for dest in list_of_dest:
-                if source > dest:
-                    edges += 1
-        return edges
+        # every edge is in the lists of both of its nodes
+        return self._num_edges // 2
+
+    def add_edge(self, source: int, dest: int) -> None:
+        """Add an edge between source and dest, both nodes must be in the graph."""
+        self._own_neighbors(source).append(dest)
+        self._own_neighbors(dest).append(source)
+        self._num_edges += 2
+
+    def remove_edge(self, source: int, dest: int) -> None:
+        """Remove the edge between source and dest.
+
+        Raise ValueError if there is none."""
+        self._own_neighbors(source).remove(dest)
+        self._own_neighbors(dest).remove(source)
+        self._num_edges -= 2
 
     def is_tree(self) -> bool:
         """
         a graph is a tree if the number of edges of each connected component is size of component - 1
         """
-        for g in self.connected_components():
-            if g.num_edges() > (g.size - 1):
-                return False
-        return True
+        # a component never has less than size - 1 edges, so checking the sums
+        # over all of them is the same as checking each one.
+        # count the components in one pass over the nodes, without building them
+        unvisited = self._visited_flags()
+        for n in self.nodes:
+            unvisited[n] = 1
+        components = 0
+        current_start = unvisited.find(1)
+        while current_start != -1:
+            components += 1
+            to_visit_stack = [current_start]
+            while to_visit_stack:
+                current = to_visit_stack.pop()
+                if unvisited[current]:
+                    unvisited[current] = 0
+                    to_visit_stack.extend(self.adjacency_list[current])
+            current_start = unvisited.find(1, current_start + 1)
+        return self.num_edges() == self._size - components
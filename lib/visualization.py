@@ -12,7 +12,7 @@ from .directed_graph import DirectedGraph
 def draw_graph(g: Graph):
     nx_graph = nx.Graph()
     nx_graph.add_nodes_from(g.nodes)
-    nx_graph.add_edges_from(g.edges)
+    nx_graph.add_edges_from(g.iter_edges())
     pos = nx.spring_layout(nx_graph)
     nx.draw_networkx_nodes(nx_graph, pos)
     nx.draw_networkx_edges(nx_graph, pos)
@@ -23,7 +23,7 @@ def draw_graph(g: Graph):
 def draw_directed_graph(g: DirectedGraph):
     nx_graph = nx.DiGraph()
     nx_graph.add_nodes_from(g.nodes)
-    nx_graph.add_edges_from(g.edges)
+    nx_graph.add_edges_from(g.iter_edges())
     pos = nx.spring_layout(nx_graph)
     nx.draw_networkx_nodes(nx_graph, pos)
     nx.draw_networkx_labels(nx_graph, pos)